@@ -0,0 +1,205 @@
+import json
+import boto3
+import os
+import time
+import base64
+import zlib
+import zipfile
+from botocore.exceptions import ClientError
+from profiling import profiled
+from content_types import get_content_type
+from archive_index import parse_archive_index
+
+s3_client = boto3.client('s3')
+
+# Environment variables
+EXTRACTED_BUCKET_NAME = os.environ['EXTRACTED_BUCKET_NAME']
+ARCHIVE_PREFIX = os.environ.get('ARCHIVE_PREFIX', 'archives')
+INDEX_CACHE_TTL = int(os.environ.get('INDEX_CACHE_TTL', '300'))
+
+# Lambda responses are limited to 6MB, which base64 encoding eats into
+MAX_MEMBER_SIZE = 4 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Common CORS headers
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Credentials': 'true'
+}
+
+# Parsed indexes kept for the life of a warm instance:
+# index key -> (loaded at, archive ETag, members)
+index_cache = {}
+
+def load_archive_index(index_key):
+    """
+    Load and parse an archive index, using the warm-instance cache when fresh.
+    Returns the ETag of the archive the index describes and its members.
+    """
+    cached = index_cache.get(index_key)
+    if cached and time.time() - cached[0] < INDEX_CACHE_TTL:
+        return cached[1], cached[2]
+
+    response = s3_client.get_object(Bucket=EXTRACTED_BUCKET_NAME, Key=index_key)
+    archive_etag, members = parse_archive_index(response['Body'].read())
+    index_cache[index_key] = (time.time(), archive_etag, members)
+    return archive_etag, members
+
+def read_archive_member(archive_key, entry, archive_etag=None):
+    """
+    Range-read a member's compressed bytes and decompress them as they stream in.
+    With archive_etag set, S3 refuses the read (412) if the archive was replaced.
+    """
+    if entry['compress_size'] == 0:
+        return b''
+
+    start = entry['data_offset']
+    end = start + entry['compress_size'] - 1
+    params = {'Bucket': EXTRACTED_BUCKET_NAME, 'Key': archive_key, 'Range': f"bytes={start}-{end}"}
+    if archive_etag:
+        params['IfMatch'] = archive_etag
+    response = s3_client.get_object(**params)
+
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if entry['compress_type'] == zipfile.ZIP_DEFLATED else None
+    chunks = []
+    crc = 0
+    for chunk in response['Body'].iter_chunks(chunk_size=STREAM_CHUNK_SIZE):
+        data = decompressor.decompress(chunk) if decompressor else chunk
+        crc = zlib.crc32(data, crc)
+        chunks.append(data)
+    if decompressor:
+        data = decompressor.flush()
+        crc = zlib.crc32(data, crc)
+        chunks.append(data)
+
+    if crc != entry['crc']:
+        raise ValueError(f"CRC mismatch reading member from {archive_key}")
+    return b''.join(chunks)
+
+def check_member_entry(member, entry):
+    """
+    Return an error response if a member is missing or too large to serve, else None
+    """
+    if entry is None:
+        return {
+            'statusCode': 404,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Member not found: {member}'})
+        }
+
+    if entry['file_size'] > MAX_MEMBER_SIZE:
+        return {
+            'statusCode': 413,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Member too large to serve: {member}'})
+        }
+
+    return None
+
+@profiled
+def lambda_handler(event, context):
+    """
+    Lambda handler to serve members of an indexed archive.
+
+    Expects query string parameters:
+    - archive: path of the archive under the archive prefix
+    - member: path of the member inside the archive; if omitted the members are listed
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        archive = params.get('archive', '').strip().strip('/')
+        member = params.get('member', '').strip()
+
+        if not archive:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'archive is required'})
+            }
+
+        if '..' in archive or len(archive) > 1000:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Invalid archive path'})
+            }
+
+        archive_key = f"{ARCHIVE_PREFIX}/{archive}"
+        index_key = f"{archive_key}.idx"
+        try:
+            archive_etag, members = load_archive_index(index_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return {
+                    'statusCode': 404,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({'error': f'Archive not found: {archive}'})
+                }
+            raise
+
+        if not member:
+            return {
+                'statusCode': 200,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({
+                    'archive': archive,
+                    'members': [{'name': name, 'size': entry['file_size']} for name, entry in members.items()]
+                })
+            }
+
+        entry = members.get(member)
+        error_response = check_member_entry(member, entry)
+        if error_response:
+            return error_response
+
+        try:
+            content = read_archive_member(archive_key, entry, archive_etag)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('PreconditionFailed', '412'):
+                raise
+
+            # The archive was replaced after its index was cached; reload the index
+            index_cache.pop(index_key, None)
+            new_etag, members = load_archive_index(index_key)
+            entry = members.get(member)
+            error_response = check_member_entry(member, entry)
+            if error_response:
+                return error_response
+
+            # An unchanged ETag means the archive was copied (e.g. by a folder
+            # move) without its bytes changing; the CRC check still guards the read
+            content = read_archive_member(archive_key, entry, new_etag if new_etag != archive_etag else None)
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': get_content_type(member),
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': 'true'
+            },
+            'body': base64.b64encode(content).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        error_message = e.response['Error']['Message']
+        print(f"AWS Error: {error_code} - {error_message}")
+
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({
+                'error': f'AWS error: {error_message}',
+                'error_code': error_code
+            })
+        }
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+        }
@@ -21,7 +21,7 @@ build_lambda()  {
     deactivate
     rm -rf .tmp_venv
     echo "Copying lambda code..."
-    cp "${LAMBDA_DIR}"/*.py "${BUILD_DIR}/"
+    cp "${LAMBDA_DIR}"/*.py common/*.py "${BUILD_DIR}/"
     echo "Creating zip ${ZIP_FILE}..."
     cd "${BUILD_DIR}"
     zip -r9 "../${ZIP_FILE}" .
@@ -32,6 +32,8 @@ build_lambda()  {
 build_lambda "file_manager"
 build_lambda "zip_processor"
 build_lambda "metadata_updater"
+build_lambda "archive_reader"
+build_lambda "folder_lister"
 
 echo
 echo "Running terraform init & apply..."
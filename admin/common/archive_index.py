@@ -0,0 +1,88 @@
+import io
+import struct
+import zipfile
+
+# Binary index of the members of a stored zip file:
+#   header:  magic (4s) + member count (uint32) + ETag length (uint16)
+#            + ETag of the archive the offsets belong to (ascii)
+#   entry:   name length (uint16) + name (utf-8) + compress type (uint16)
+#            + data offset (uint64) + compressed size (uint64)
+#            + file size (uint64) + crc32 (uint32)
+# All integers are little-endian. data offset points at the first byte of the
+# member's compressed data, past its local file header.
+INDEX_MAGIC = b'ZIX2'
+HEADER_FORMAT = '<4sIH'
+ENTRY_FORMAT = '<QQQI'
+LOCAL_HEADER_FORMAT = '<4s5H3L2H'
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+# Compression methods the reader can decompress as a stream
+SUPPORTED_COMPRESSION = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+def build_archive_index(zip_content, archive_etag, include_member=None):
+    """
+    Build the binary index for a zip file held in memory, stored as the
+    object with the given ETag
+    """
+    entries = []
+    with zipfile.ZipFile(io.BytesIO(zip_content), 'r') as zip_ref:
+        for file_info in zip_ref.infolist():
+            if file_info.is_dir() or file_info.flag_bits & 0x1:
+                continue
+            if file_info.compress_type not in SUPPORTED_COMPRESSION:
+                print(f"Skipping member with unsupported compression: {file_info.filename}")
+                continue
+            if include_member and not include_member(file_info.filename):
+                continue
+
+            # The local header's extra field may differ from the central directory's
+            local_header = zip_content[file_info.header_offset:file_info.header_offset + struct.calcsize(LOCAL_HEADER_FORMAT)]
+            fields = struct.unpack(LOCAL_HEADER_FORMAT, local_header)
+            if fields[0] != LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile(f"Bad local header for {file_info.filename}")
+            name_length, extra_length = fields[-2], fields[-1]
+            data_offset = file_info.header_offset + len(local_header) + name_length + extra_length
+
+            entries.append((file_info.filename, file_info.compress_type, data_offset,
+                            file_info.compress_size, file_info.file_size, file_info.CRC))
+
+    entries.sort()
+    encoded_etag = archive_etag.encode('ascii')
+    index = [struct.pack(HEADER_FORMAT, INDEX_MAGIC, len(entries), len(encoded_etag)), encoded_etag]
+    for name, compress_type, data_offset, compress_size, file_size, crc in entries:
+        encoded_name = name.encode('utf-8')
+        index.append(struct.pack('<H', len(encoded_name)))
+        index.append(encoded_name)
+        index.append(struct.pack('<H', compress_type))
+        index.append(struct.pack(ENTRY_FORMAT, data_offset, compress_size, file_size, crc))
+    return b''.join(index)
+
+def parse_archive_index(index_content):
+    """
+    Parse a binary index into the archive ETag and a dictionary of member name -> entry
+    """
+    magic, count, etag_length = struct.unpack_from(HEADER_FORMAT, index_content, 0)
+    if magic != INDEX_MAGIC:
+        raise ValueError("Not an archive index")
+
+    members = {}
+    position = struct.calcsize(HEADER_FORMAT)
+    archive_etag = index_content[position:position + etag_length].decode('ascii')
+    position += etag_length
+    for _ in range(count):
+        (name_length,) = struct.unpack_from('<H', index_content, position)
+        position += 2
+        name = index_content[position:position + name_length].decode('utf-8')
+        position += name_length
+        (compress_type,) = struct.unpack_from('<H', index_content, position)
+        position += 2
+        data_offset, compress_size, file_size, crc = struct.unpack_from(ENTRY_FORMAT, index_content, position)
+        position += struct.calcsize(ENTRY_FORMAT)
+        members[name] = {
+            'compress_type': compress_type,
+            'data_offset': data_offset,
+            'compress_size': compress_size,
+            'file_size': file_size,
+            'crc': crc
+        }
+    return archive_etag, members
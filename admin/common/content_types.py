@@ -0,0 +1,79 @@
+def get_content_type(filename):
+    """
+    Determine content type based on file extension
+    """
+    extension = filename.lower().split('.')[-1] if '.' in filename else ''
+    
+    content_types = {
+        # Text files
+        'txt': 'text/plain',
+        'md': 'text/markdown',
+        'csv': 'text/csv',
+        'json': 'application/json',
+        'xml': 'application/xml',
+        'html': 'text/html',
+        'htm': 'text/html',
+        'css': 'text/css',
+        'js': 'application/javascript',
+        'ts': 'application/typescript',
+        
+        # Images
+        'jpg': 'image/jpeg',
+        'jpeg': 'image/jpeg',
+        'png': 'image/png',
+        'gif': 'image/gif',
+        'bmp': 'image/bmp',
+        'webp': 'image/webp',
+        'svg': 'image/svg+xml',
+        'ico': 'image/x-icon',
+        
+        # Documents
+        'pdf': 'application/pdf',
+        'doc': 'application/msword',
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'xls': 'application/vnd.ms-excel',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'ppt': 'application/vnd.ms-powerpoint',
+        'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        
+        # Archives
+        'zip': 'application/zip',
+        'tar': 'application/x-tar',
+        'gz': 'application/gzip',
+        'rar': 'application/x-rar-compressed',
+        '7z': 'application/x-7z-compressed',
+        
+        # Media
+        'mp3': 'audio/mpeg',
+        'wav': 'audio/wav',
+        'mp4': 'video/mp4',
+        'avi': 'video/x-msvideo',
+        'mov': 'video/quicktime',
+        'wmv': 'video/x-ms-wmv',
+        
+        # Programming languages
+        'py': 'text/x-python',
+        'java': 'text/x-java-source',
+        'c': 'text/x-c',
+        'cpp': 'text/x-c++',
+        'h': 'text/x-c',
+        'hpp': 'text/x-c++',
+        'php': 'application/x-php',
+        'rb': 'text/x-ruby',
+        'go': 'text/x-go',
+        'rs': 'text/x-rust',
+        'sh': 'application/x-sh',
+        'bat': 'application/x-bat',
+        'ps1': 'application/x-powershell',
+        
+        # Data files
+        'yaml': 'application/x-yaml',
+        'yml': 'application/x-yaml',
+        'toml': 'application/toml',
+        'ini': 'text/plain',
+        'conf': 'text/plain',
+        'cfg': 'text/plain',
+        'log': 'text/plain'
+    }
+    
+    return content_types.get(extension, 'application/octet-stream')
@@ -0,0 +1,41 @@
+import os
+import uuid
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Environment variables
+# Marker object rewritten whenever the extracted files bucket changes, so warm
+# folder listing caches in other Lambdas know to drop their entries
+LISTING_MARKER_BUCKET = os.environ.get('LISTING_MARKER_BUCKET', '')
+LISTING_MARKER_KEY = os.environ.get('LISTING_MARKER_KEY', 'listing/generation')
+
+s3_client = boto3.client('s3')
+
+def bump_listing_generation():
+    """
+    Invalidate folder listing caches after a write to the extracted files bucket
+    """
+    if not LISTING_MARKER_BUCKET:
+        return
+
+    try:
+        s3_client.put_object(Bucket=LISTING_MARKER_BUCKET, Key=LISTING_MARKER_KEY,
+                             Body=str(uuid.uuid4()).encode('utf-8'), ContentType='text/plain')
+    except Exception as e:
+        print(f"Error bumping listing generation: {str(e)}")
+
+def current_listing_generation():
+    """
+    Return the ETag of the marker object, '' if it has never been written, or
+    None if there is no marker configured
+    """
+    if not LISTING_MARKER_BUCKET:
+        return None
+
+    try:
+        return s3_client.head_object(Bucket=LISTING_MARKER_BUCKET, Key=LISTING_MARKER_KEY)['ETag']
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return ''
+        raise
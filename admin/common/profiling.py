@@ -0,0 +1,86 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import tracemalloc
+from datetime import datetime
+from functools import wraps
+
+import boto3
+
+# Environment variables
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '1.0'))
+# Either s3://bucket/prefix or a local directory
+PROFILING_OUTPUT = os.environ.get('PROFILING_OUTPUT', '/tmp/profiles')
+PROFILING_TOP_ALLOCATIONS = int(os.environ.get('PROFILING_TOP_ALLOCATIONS', '25'))
+
+def profiled(handler):
+    """
+    Wrap a Lambda handler so a sampled fraction of invocations capture cProfile
+    stats and tracemalloc top allocations. Returns the handler unchanged when
+    profiling is disabled, so there is no overhead.
+    """
+    if not PROFILING_ENABLED:
+        return handler
+
+    @wraps(handler)
+    def wrapper(event, context):
+        if random.random() >= PROFILING_SAMPLE_RATE:
+            return handler(event, context)
+
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
+        try:
+            return handler(event, context)
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            try:
+                write_profile_artifacts(profiler, snapshot, context)
+            except Exception as e:
+                print(f"Error writing profiling artifacts: {str(e)}")
+
+    return wrapper
+
+def write_profile_artifacts(profiler, snapshot, context):
+    """
+    Write the raw cProfile stats and a text summary of the profile and the top
+    allocations to the configured bucket or local directory
+    """
+    function_name = getattr(context, 'function_name', 'local')
+    request_id = getattr(context, 'aws_request_id', 'local')
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    name = f"{function_name}/{timestamp}_{request_id}"
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(50)
+    summary.write(f"\nTop {PROFILING_TOP_ALLOCATIONS} allocations:\n")
+    for stat in snapshot.statistics('lineno')[:PROFILING_TOP_ALLOCATIONS]:
+        summary.write(f"{stat}\n")
+
+    # Same format as cProfile.Profile.dump_stats, loadable with pstats.Stats(path)
+    profiler.create_stats()
+    raw_stats = marshal.dumps(profiler.stats)
+
+    if PROFILING_OUTPUT.startswith('s3://'):
+        bucket, _, prefix = PROFILING_OUTPUT[len('s3://'):].partition('/')
+        key = f"{prefix.rstrip('/')}/{name}" if prefix else name
+        s3_client = boto3.client('s3')
+        s3_client.put_object(Bucket=bucket, Key=f"{key}.prof", Body=raw_stats,
+                             ContentType='application/octet-stream')
+        s3_client.put_object(Bucket=bucket, Key=f"{key}.txt", Body=summary.getvalue().encode('utf-8'),
+                             ContentType='text/plain')
+        print(f"Profiling artifacts written to s3://{bucket}/{key}")
+    else:
+        path = os.path.join(PROFILING_OUTPUT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.prof", 'wb') as f:
+            f.write(raw_stats)
+        with open(f"{path}.txt", 'w') as f:
+            f.write(summary.getvalue())
+        print(f"Profiling artifacts written to {path}")
@@ -4,19 +4,41 @@ import os
 from datetime import datetime, timedelta
 import jwt
 from botocore.exceptions import ClientError
+from profiling import profiled
+from listing_generation import bump_listing_generation
 import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Environment variables
 ZIP_BUCKET_NAME = os.environ['ZIP_BUCKET_NAME']
 EXTRACTED_BUCKET_NAME = os.environ['EXTRACTED_BUCKET_NAME']
 ADMIN_GROUP_NAME = os.environ['ADMIN_GROUP_NAME']
+MOVE_MAX_WORKERS = int(os.environ.get('MOVE_MAX_WORKERS', '16'))
+# Indexed archives of tabs/<folder> are kept under <ARCHIVE_PREFIX>/<folder>
+ARCHIVE_PREFIX = os.environ.get('ARCHIVE_PREFIX', 'archives')
+
+# Objects larger than this are copied with multipart upload_part_copy
+MULTIPART_COPY_THRESHOLD = 256 * 1024 * 1024
+MULTIPART_COPY_PART_SIZE = 64 * 1024 * 1024
+
+# Hand the remaining copies to a background invocation when less than this
+# much time is left in the current one
+MOVE_TIME_RESERVE_MS = 10000
 
 s3_client = boto3.client('s3')
+lambda_client = boto3.client('lambda')
 
+@profiled
 def lambda_handler(event, context):
     """
     Main Lambda handler for file management operations
     """
+    # Continuation of a folder move handed off by an earlier invocation. Errors
+    # are raised rather than returned so Lambda retries the async invocation.
+    if 'folder_move_job' in event:
+        return run_folder_move_job(event['folder_move_job'], context, background=True)
+
     try:
         # Extract route and method
         resource = event.get("resource")
@@ -38,6 +60,8 @@ def lambda_handler(event, context):
         # Route to appropriate handler
         if route_key == 'POST/presigned-url':
             return handle_presigned_url_request(event)
+        elif route_key == 'POST/folder/{folder_name}/move':
+            return handle_folder_move(event, context)
         elif route_key.startswith('DELETE/folder/'):
             return handle_folder_deletion(event)
         elif route_key == 'DELETE/file':
@@ -149,7 +173,7 @@ def handle_presigned_url_request(event):
                 'x-amz-meta-upload-timestamp': timestamp
             }
 
-        for key in ['caption', 'position']:
+        for key in ['caption', 'position', 'archive-mode']:
             if key in body:
                 fields[f"x-amz-meta-{key}"] = body[key]
 
@@ -218,14 +242,15 @@ def handle_folder_deletion(event):
         # URL decode the folder name
         folder_name = urllib.parse.unquote(folder_name)
         
-        # List all objects in the folder
+        # List all objects in the folder, and any indexed archives stored for it
         folder_prefix = f"{folder_name}/"
         paginator = s3_client.get_paginator('list_objects_v2')
         
         objects_to_delete = []
-        for page in paginator.paginate(Bucket=EXTRACTED_BUCKET_NAME, Prefix=folder_prefix):
-            for obj in page.get('Contents', []):
-                objects_to_delete.append({'Key': obj['Key']})
+        for prefix in (folder_prefix, archive_folder_prefix(folder_prefix)):
+            for page in paginator.paginate(Bucket=EXTRACTED_BUCKET_NAME, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    objects_to_delete.append({'Key': obj['Key']})
         
         if not objects_to_delete:
             return {
@@ -247,6 +272,7 @@ def handle_folder_deletion(event):
                 Delete={'Objects': batch}
             )
             deleted_count += len(response.get('Deleted', []))
+        bump_listing_generation()
         
         return {
             'statusCode': 200,
@@ -329,6 +355,7 @@ def handle_file_deletion(event):
                     
             except ClientError as e:
                 errors.append(f"Batch deletion failed: {str(e)}")
+        bump_listing_generation()
         
         result = {
             'message': f'Deletion completed. {deleted_count} files deleted.',
@@ -360,3 +387,307 @@ def handle_file_deletion(event):
             },
             'body': json.dumps({'error': f'Failed to delete files: {str(e)}'})
         }
+
+def handle_folder_move(event, context):
+    """
+    Move or rename a folder in the extracted files bucket using server-side copies
+    """
+    try:
+        path_parameters = event.get('pathParameters', {})
+        folder_name = path_parameters.get('folder_name', '').strip()
+        body = json.loads(event.get('body', '{}'))
+        destination = body.get('destination', '').strip().strip('/')
+
+        if not folder_name or not destination:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Allow-Credentials': 'true'
+                },
+                'body': json.dumps({'error': 'folder_name and destination are required'})
+            }
+
+        source_folder = 'tabs/' + urllib.parse.unquote(folder_name).strip('/')
+        target_folder = 'tabs/' + destination
+        source_prefix = f"{source_folder}/"
+        target_prefix = f"{target_folder}/"
+
+        if '..' in target_prefix or target_prefix.startswith(source_prefix) or source_prefix.startswith(target_prefix):
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Allow-Credentials': 'true'
+                },
+                'body': json.dumps({'error': 'destination must not overlap the source folder'})
+            }
+
+        # A target partly filled by an earlier attempt at this same move is resumed
+        # Folders uploaded in indexed mode only exist under the archives prefix
+        target_exists = any(
+            s3_client.list_objects_v2(Bucket=EXTRACTED_BUCKET_NAME, Prefix=prefix, MaxKeys=1).get('KeyCount', 0) > 0
+            for prefix in (target_prefix, archive_folder_prefix(target_prefix))
+        )
+        move_record = read_move_record(target_prefix)
+        resuming = move_record is not None and move_record.get('source_prefix') == source_prefix
+        if target_exists and not resuming:
+            return {
+                'statusCode': 409,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Allow-Credentials': 'true'
+                },
+                'body': json.dumps({'error': f'Folder "{target_folder}" already exists'})
+            }
+
+        # Indexed archives stored for the folder move with it
+        objects_to_move = list_folder_objects(source_prefix) + list_folder_objects(archive_folder_prefix(source_prefix))
+        if not objects_to_move:
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Allow-Credentials': 'true'
+                },
+                'body': json.dumps({'error': f'Folder "{source_folder}" not found'})
+            }
+
+        job = {
+            'job_id': move_record['job_id'] if resuming else str(uuid.uuid4()),
+            'source_prefix': source_prefix,
+            'target_prefix': target_prefix,
+            'moved_files': 0
+        }
+        write_move_record(job, status='in-progress')
+        return run_folder_move_job(job, context, objects=objects_to_move)
+
+    except Exception as e:
+        print(f"Error moving folder: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': 'true'
+            },
+            'body': json.dumps({'error': f'Failed to move folder: {str(e)}'})
+        }
+
+def archive_folder_prefix(folder_prefix):
+    """
+    Prefix holding the indexed archives of a tabs/ folder prefix
+    """
+    return ARCHIVE_PREFIX + '/' + folder_prefix[len('tabs/'):]
+
+def list_folder_objects(folder_prefix):
+    """
+    List the key and size of every object under a folder prefix
+    """
+    paginator = s3_client.get_paginator('list_objects_v2')
+    objects = []
+    for page in paginator.paginate(Bucket=EXTRACTED_BUCKET_NAME, Prefix=folder_prefix):
+        for obj in page.get('Contents', []):
+            objects.append({'Key': obj['Key'], 'Size': obj['Size']})
+    return objects
+
+def move_record_key(target_prefix):
+    """
+    Key of the record tracking an unfinished move into target_prefix
+    """
+    return f"moves/{target_prefix.rstrip('/')}.json"
+
+def read_move_record(target_prefix):
+    """
+    Read the record of an unfinished move into target_prefix, or None
+    """
+    try:
+        response = s3_client.get_object(Bucket=ZIP_BUCKET_NAME, Key=move_record_key(target_prefix))
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None
+        raise
+    return json.loads(response['Body'].read())
+
+def write_move_record(job, status, failed_files=None):
+    """
+    Record the state of a move so a failed or interrupted one can be traced and resumed
+    """
+    s3_client.put_object(
+        Bucket=ZIP_BUCKET_NAME,
+        Key=move_record_key(job['target_prefix']),
+        Body=json.dumps({**job, 'status': status, 'failed_files': failed_files or []}).encode('utf-8'),
+        ContentType='application/json'
+    )
+
+def run_folder_move_job(job, context, objects=None, background=False):
+    """
+    Copy the objects of a folder move and bulk-delete the sources that copied,
+    handing the remainder to a background invocation if time runs out.
+    The job carries only prefixes and counters; a background invocation
+    re-lists the source prefix, where only uncopied objects are left.
+    """
+    source_prefix = job['source_prefix']
+    target_prefix = job['target_prefix']
+    moved_count = job.get('moved_files', 0)
+    archive_source_prefix = archive_folder_prefix(source_prefix)
+    archive_target_prefix = archive_folder_prefix(target_prefix)
+    if objects is None:
+        objects = list_folder_objects(source_prefix) + list_folder_objects(archive_source_prefix)
+
+    def target_key(source_key):
+        if source_key.startswith(source_prefix):
+            return target_prefix + source_key[len(source_prefix):]
+        return archive_target_prefix + source_key[len(archive_source_prefix):]
+
+    def out_of_time():
+        return context is not None and context.get_remaining_time_in_millis() < MOVE_TIME_RESERVE_MS
+
+    def move_object(obj):
+        # Leave the object for the background invocation once time runs short
+        if out_of_time():
+            return False
+        copy_folder_object(obj, target_key(obj['Key']))
+        return True
+
+    moved = []
+    pending = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=MOVE_MAX_WORKERS) as executor:
+        futures = {executor.submit(move_object, obj): obj for obj in objects}
+        for future in as_completed(futures):
+            key = futures[future]['Key']
+            try:
+                if future.result():
+                    moved.append({'Key': key})
+                else:
+                    pending.append(key)
+            except Exception as e:
+                print(f"Error copying {key}: {str(e)}")
+                failed.append({'key': key, 'error': str(e)})
+
+    # Delete only the sources that copied, in batches of 1000 (S3 limit)
+    for i in range(0, len(moved), 1000):
+        batch = moved[i:i+1000]
+        response = s3_client.delete_objects(
+            Bucket=EXTRACTED_BUCKET_NAME,
+            Delete={'Objects': batch, 'Quiet': True}
+        )
+        for error in response.get('Errors', []):
+            print(f"Failed to delete {error['Key']}: {error['Message']}")
+    moved_count += len(moved)
+    job = {**job, 'moved_files': moved_count}
+    bump_listing_generation()
+
+    if pending:
+        # Out of time: continue the remaining copies asynchronously
+        lambda_client.invoke(
+            FunctionName=context.function_name,
+            InvocationType='Event',
+            Payload=json.dumps({'folder_move_job': job})
+        )
+        print(f"Folder move {job['job_id']} continuing in background with {len(pending)} objects remaining")
+        return {
+            'statusCode': 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': 'true'
+            },
+            'body': json.dumps({
+                'message': 'Folder move continuing in background',
+                'job_id': job['job_id'],
+                'moved_files': moved_count,
+                'remaining_files': len(pending) + len(failed)
+            })
+        }
+
+    if failed:
+        # Failed objects stay in the source; retrying the move resumes it
+        write_move_record(job, status='failed', failed_files=failed)
+        print(f"Folder move {job['job_id']} incomplete: {len(failed)} files failed to copy")
+        if background:
+            raise Exception(f"Folder move {job['job_id']}: {len(failed)} files failed to copy")
+        return {
+            'statusCode': 207,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': 'true'
+            },
+            'body': json.dumps({
+                'message': f'Moved {moved_count} files; {len(failed)} failed. Retry the move to resume it.',
+                'job_id': job['job_id'],
+                'moved_files': moved_count,
+                'errors': [f"Failed to copy {item['key']}: {item['error']}" for item in failed],
+                'partial_success': True
+            })
+        }
+
+    s3_client.delete_object(Bucket=ZIP_BUCKET_NAME, Key=move_record_key(target_prefix))
+    print(f"Folder move {job['job_id']} completed: {moved_count} files moved to {target_prefix}")
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Credentials': 'true'
+        },
+        'body': json.dumps({
+            'message': f'Successfully moved folder "{source_prefix.rstrip("/")}" to "{target_prefix.rstrip("/")}"',
+            'moved_files': moved_count
+        })
+    }
+
+def copy_folder_object(obj, target_key):
+    """
+    Server-side copy of a single object, keeping its metadata and content type
+    """
+    copy_source = {'Bucket': EXTRACTED_BUCKET_NAME, 'Key': obj['Key']}
+
+    if obj['Size'] <= MULTIPART_COPY_THRESHOLD:
+        s3_client.copy_object(
+            Bucket=EXTRACTED_BUCKET_NAME,
+            Key=target_key,
+            CopySource=copy_source,
+            MetadataDirective='COPY'
+        )
+        return
+
+    head_response = s3_client.head_object(Bucket=EXTRACTED_BUCKET_NAME, Key=obj['Key'])
+    upload = s3_client.create_multipart_upload(
+        Bucket=EXTRACTED_BUCKET_NAME,
+        Key=target_key,
+        ContentType=head_response.get('ContentType', 'application/octet-stream'),
+        Metadata=head_response.get('Metadata', {})
+    )
+    upload_id = upload['UploadId']
+    size = head_response['ContentLength']
+
+    try:
+        parts = []
+        for part_number, start in enumerate(range(0, size, MULTIPART_COPY_PART_SIZE), start=1):
+            end = min(start + MULTIPART_COPY_PART_SIZE, size) - 1
+            part = s3_client.upload_part_copy(
+                Bucket=EXTRACTED_BUCKET_NAME,
+                Key=target_key,
+                CopySource=copy_source,
+                CopySourceRange=f"bytes={start}-{end}",
+                PartNumber=part_number,
+                UploadId=upload_id
+            )
+            parts.append({'PartNumber': part_number, 'ETag': part['CopyPartResult']['ETag']})
+
+        s3_client.complete_multipart_upload(
+            Bucket=EXTRACTED_BUCKET_NAME,
+            Key=target_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(Bucket=EXTRACTED_BUCKET_NAME, Key=target_key, UploadId=upload_id)
+        raise
@@ -0,0 +1,194 @@
+import json
+import boto3
+import os
+import time
+import hashlib
+import base64
+from botocore.exceptions import ClientError
+from profiling import profiled
+from listing_generation import current_listing_generation
+
+s3_client = boto3.client('s3')
+
+# Environment variables
+EXTRACTED_BUCKET_NAME = os.environ['EXTRACTED_BUCKET_NAME']
+LISTING_ROOT = os.environ.get('LISTING_ROOT', 'tabs')
+LISTING_PAGE_SIZE = int(os.environ.get('LISTING_PAGE_SIZE', '200'))
+# Uploads made directly to S3 with presigned URLs don't bump the listing
+# generation, so cached pages also expire after this many seconds
+LISTING_CACHE_TTL = int(os.environ.get('LISTING_CACHE_TTL', '60'))
+
+# Common CORS headers
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Credentials': 'true',
+    'Access-Control-Expose-Headers': 'ETag'
+}
+
+# Listing pages kept for the life of a warm instance:
+# (prefix, continuation token) -> {'generation', 'loaded_at', 'body', 'etag'}
+listing_cache = {}
+
+def encode_page_token(s3_token, folders_seen, files_seen):
+    """
+    Wrap the S3 continuation token with the folders and files counted on the
+    pages before it, so the last page can report totals for the whole level
+    """
+    state = {'token': s3_token, 'folders': folders_seen, 'files': files_seen}
+    return base64.urlsafe_b64encode(json.dumps(state).encode('utf-8')).decode('ascii')
+
+def decode_page_token(continuation_token):
+    """
+    Unwrap a token from encode_page_token into (S3 token, folders seen, files seen),
+    raising ValueError if it is not one
+    """
+    if not continuation_token:
+        return None, 0, 0
+    try:
+        state = json.loads(base64.urlsafe_b64decode(continuation_token.encode('ascii')))
+        return str(state['token']), int(state['folders']), int(state['files'])
+    except (TypeError, KeyError, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid continuation token: {str(e)}")
+
+def list_folder_level(prefix, continuation_token):
+    """
+    List one page of the immediate subfolders and files under a prefix
+    """
+    s3_token, folders_seen, files_seen = decode_page_token(continuation_token)
+    params = {
+        'Bucket': EXTRACTED_BUCKET_NAME,
+        'Prefix': prefix,
+        'Delimiter': '/',
+        'MaxKeys': LISTING_PAGE_SIZE
+    }
+    if s3_token:
+        params['ContinuationToken'] = s3_token
+
+    response = s3_client.list_objects_v2(**params)
+
+    folders = [
+        {'name': common['Prefix'][len(prefix):].rstrip('/'), 'prefix': common['Prefix']}
+        for common in response.get('CommonPrefixes', [])
+    ]
+    files = [
+        {
+            'name': obj['Key'][len(prefix):],
+            'key': obj['Key'],
+            'size': obj['Size'],
+            'last_modified': obj['LastModified'].isoformat()
+        }
+        for obj in response.get('Contents', [])
+        if obj['Key'] != prefix
+    ]
+
+    folders_seen += len(folders)
+    files_seen += len(files)
+    next_token = None
+    if response.get('NextContinuationToken'):
+        next_token = encode_page_token(response['NextContinuationToken'], folders_seen, files_seen)
+
+    # key_count covers this page only; the level totals are known once the
+    # last page has been listed and are null until then
+    return {
+        'bucket': EXTRACTED_BUCKET_NAME,
+        'prefix': prefix,
+        'folders': folders,
+        'files': files,
+        'key_count': len(folders) + len(files),
+        'folder_count': None if next_token else folders_seen,
+        'file_count': None if next_token else files_seen,
+        'next_token': next_token
+    }
+
+def get_listing_page(prefix, continuation_token):
+    """
+    Return the body and ETag for a listing page, from the warm-instance cache
+    when nothing has been written since it was loaded
+    """
+    generation = current_listing_generation()
+    cache_key = (prefix, continuation_token)
+    cached = listing_cache.get(cache_key)
+    if (cached and cached['generation'] == generation
+            and time.time() - cached['loaded_at'] < LISTING_CACHE_TTL):
+        return cached['body'], cached['etag']
+
+    body = json.dumps(list_folder_level(prefix, continuation_token))
+    etag = '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+    listing_cache[cache_key] = {
+        'generation': generation,
+        'loaded_at': time.time(),
+        'body': body,
+        'etag': etag
+    }
+    return body, etag
+
+@profiled
+def lambda_handler(event, context):
+    """
+    Lambda handler to list one folder level of the extracted files bucket.
+
+    Expects query string parameters:
+    - prefix: folder to list, under the listing root (defaults to the root)
+    - continuation_token: token from the previous page's next_token
+    Honours If-None-Match against the ETag of the page.
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        prefix = params.get('prefix', '').strip().strip('/') or LISTING_ROOT
+        continuation_token = params.get('continuation_token') or None
+
+        try:
+            decode_page_token(continuation_token)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': str(e)})
+            }
+
+        if '..' in prefix or not (prefix == LISTING_ROOT or prefix.startswith(LISTING_ROOT + '/')):
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Invalid prefix'})
+            }
+
+        body, etag = get_listing_page(prefix + '/', continuation_token)
+
+        headers = {**CORS_HEADERS, 'ETag': etag, 'Cache-Control': 'no-cache'}
+        request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+        if etag in [tag.strip() for tag in request_headers.get('if-none-match', '').split(',')]:
+            return {
+                'statusCode': 304,
+                'headers': headers,
+                'body': ''
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': body
+        }
+
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        error_message = e.response['Error']['Message']
+        print(f"AWS Error: {error_code} - {error_message}")
+
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({
+                'error': f'AWS error: {error_message}',
+                'error_code': error_code
+            })
+        }
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+        }
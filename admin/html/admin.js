@@ -137,7 +137,8 @@ async function handleUpload(event) {
             },
             body: JSON.stringify({
                 folder_name: folderName,
-                file_name: file.name
+                file_name: file.name,
+                'archive-mode': document.getElementById('indexedArchive').checked ? 'indexed' : 'extract'
             })
         });
 
@@ -349,6 +350,48 @@ async function deleteFolder() {
     }
 }
 
+async function moveFolder() {
+    if (!isAdmin) {
+        showMessage('Admin privileges required.', 'error');
+        return;
+    }
+
+    const folderName = document.getElementById('moveFolderName').value.trim();
+    const destination = document.getElementById('moveFolderDestination').value.trim();
+    if (!folderName || !destination) {
+        showMessage('Please enter the folder name and its new name.', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch(`${CONFIG.apiEndpoint}/folder/${encodeURIComponent(folderName)}/move`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${accessToken}`
+            },
+            body: JSON.stringify({
+                destination: destination
+            })
+        });
+
+        const result = await response.json();
+
+        if (response.status === 202) {
+            showMessage(`Folder "${folderName}" is being moved in the background. ${result.remaining_files} files remaining.`, 'info');
+        } else if (response.ok) {
+            showMessage(`Folder "${folderName}" moved to "${destination}". ${result.moved_files} files moved.`, 'success');
+            document.getElementById('moveFolderName').value = '';
+            document.getElementById('moveFolderDestination').value = '';
+        } else {
+            showMessage(`Failed to move folder: ${result.error}`, 'error');
+        }
+    } catch (error) {
+        console.error('Move folder error:', error);
+        showMessage(`Error moving folder: ${error.message}`, 'error');
+    }
+}
+
 async function deleteFiles() {
     if (!isAdmin) {
         showMessage('Admin privileges required.', 'error');
@@ -0,0 +1,2 @@
+// Rendered by Terraform; read by the homepage browse pages
+var FOLDER_LISTING_URL = '${folder_listing_url}';
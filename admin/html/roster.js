@@ -56,7 +56,8 @@ async function fetchObjectMetadata(url) {
         if (!response.ok) 
             throw new Error(`HTTP ${response.status}`);
         
-        const metadata = {"caption" : "", "position" : 100000 };
+        // Images without a position sort to the end
+        const metadata = {"caption" : "", "position" : Number.MAX_SAFE_INTEGER };
 
         response.headers.forEach( (value, key) => {
             if (key.toLowerCase() == "x-amz-meta-position")
@@ -171,7 +172,6 @@ function render() {
         <form id="updateCaption">
               <input type="hidden" name="key" id="imageKey" value="${escapeHtml(currentImage.key)}"/>
                 <div class="form-group">
-                    <input type="hidden" id="position" value="${escapeHtml(currentImage.position)}" />
                     <input type="text" id="caption" name="caption" required 
                            placeholder="${escapeHtml(currentImage.caption)}" />
                 </div>
@@ -269,6 +269,7 @@ const state = {
     autoPlayInterval: null,
     hasUnsavedChanges: false,
     isSaving: false,
+    movedKeys: new Set(),
 };
 
 /**
@@ -459,10 +460,8 @@ function handleDrop(e) {
         const [draggedImage] = newImages.splice(dragState.draggedIndex, 1);
         newImages.splice(dropIndex, 0, draggedImage);
         
-        // Update positions based on new order
-        newImages.forEach((img, index) => {
-            img.position = index;
-        });
+        // Only the dragged image gets a new position when the order is saved
+        state.movedKeys.add(draggedImage.key);
         
         // Update state
         state.images = newImages;
@@ -496,24 +495,48 @@ async function saveOrder() {
         state.isSaving = true;
         render();
         
-        // Update all images with their current positions
-        const updatePromises = state.images.map((img, index) => {
-            return updateS3Metadata(img.key, { 
-                "caption": img.caption, 
-                "position": index.toString()
-            });
-        });
-        
-        const results = await Promise.all(updatePromises);
+        // Only moved images are rewritten. Each is placed between its left
+        // neighbour (already saved) and the next image that was not moved, whose
+        // stored position is still valid. Saves run in order for that reason,
+        // and stop at the first failure: later images would otherwise be placed
+        // after a neighbour whose position was never written.
+        const movedCount = state.movedKeys.size;
+        let savedCount = 0;
+        let failed = false;
+        let rebalanced = false;
+        for (let index = 0; index < state.images.length; index++) {
+            const img = state.images[index];
+            if (!state.movedKeys.has(img.key)) {
+                continue;
+            }
+            const after = index > 0 ? state.images[index - 1].key : null;
+            const next = state.images.slice(index + 1).find(other => !state.movedKeys.has(other.key));
+            const before = next ? next.key : null;
         
-        // Check if all updates were successful
-        const failedUpdates = results.filter(result => result === null);
+            const result = await updateS3Metadata(img.key, {}, { "after": after, "before": before });
+            if (result === null) {
+                failed = true;
+                break;
+            }
+            img.position = parseInt(result.metadata.position);
+            rebalanced = rebalanced || result.rebalanced;
+            state.movedKeys.delete(img.key);
+            savedCount++;
+        }
         
-        if (failedUpdates.length === 0) {
+        if (!failed) {
             state.hasUnsavedChanges = false;
-            showMessage(`Successfully saved order for ${results.length} image(s)`, 'success');
+            showMessage(`Successfully saved order for ${savedCount} image(s)`, 'success');
         } else {
-            showMessage(`Saved ${results.length - failedUpdates.length} of ${results.length} images. Some updates failed.`, 'error');
+            showMessage(`Saved ${savedCount} of ${movedCount} moved images. Stopped at the first failure; save again to retry.`, 'error');
+        }
+        
+        // Other images were renumbered on the server; pick up their new positions.
+        // The reloaded list is the saved order, so nothing is left pending.
+        if (rebalanced) {
+            state.images = await fetchImagesFromS3();
+            state.movedKeys.clear();
+            state.hasUnsavedChanges = false;
         }
     } catch (error) {
         console.error('Error saving order:', error);
@@ -604,10 +627,8 @@ function swapImages(index1, index2) {
     newImages[index1] = newImages[index2];
     newImages[index2] = temp;
     
-    // Update positions
-    newImages.forEach((img, index) => {
-        img.position = index;
-    });
+    // Swapping neighbours is the same as moving one of them
+    state.movedKeys.add(temp.key);
     
     // Update state
     state.images = newImages;
@@ -672,13 +693,13 @@ window.addEventListener('beforeunload', () => {
 
 async function doUpdateCaption() {
     const caption = document.getElementById("caption").value;
-    const position = document.getElementById("position").value;
     const key = document.getElementById("imageKey").value;    
-    await updateS3Metadata(key, { "caption" : caption, "position": position  })
+    // Position is left as stored; it may have been rebalanced since the page loaded
+    await updateS3Metadata(key, { "caption" : caption })
 }
 
 
-async function updateS3Metadata(objectKey, metadata) {
+async function updateS3Metadata(objectKey, metadata, moveBetween = null) {
 
     if (!metadata || typeof metadata !== 'object' || Array.isArray(metadata) || metadata === null) {
         showMessage('Metadata must be a valid object.', 'error');
@@ -695,7 +716,8 @@ async function updateS3Metadata(objectKey, metadata) {
             body: JSON.stringify({
                 "bucket_name": BUCKET_NAME,
                 "object_key": objectKey,
-                "metadata": metadata
+                "metadata": metadata,
+                ...(moveBetween ? { "move_between": moveBetween } : {})
             })
         });
 
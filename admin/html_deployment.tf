@@ -105,3 +105,17 @@ resource "aws_s3_object" "callback_html" {
   content_type = "text/html"
   content      = data.template_file.callback.rendered
 }
+
+data "template_file" "browse_config" {
+  template = file("${path.module}/html/browse-config.js")
+  vars = {
+    folder_listing_url = "${aws_apigatewayv2_api.main.api_endpoint}/prod/folders"
+  }
+}
+
+resource "aws_s3_object" "browse_config_js" {
+  bucket       = var.web_bucket
+  key          = "browse-config.js"
+  content_type = "text/javascript"
+  content      = data.template_file.browse_config.rendered
+}
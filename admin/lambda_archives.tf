@@ -15,6 +15,11 @@ resource "aws_lambda_function" "file_manager" {
       ZIP_BUCKET_NAME       = aws_s3_bucket.zip_uploads.bucket
       EXTRACTED_BUCKET_NAME = aws_s3_bucket.extracted_files.bucket
       ADMIN_GROUP_NAME      = aws_cognito_user_group.admin.name
+      ARCHIVE_PREFIX        = "archives"
+      LISTING_MARKER_BUCKET = aws_s3_bucket.zip_uploads.bucket
+      PROFILING_ENABLED     = var.profiling_enabled
+      PROFILING_SAMPLE_RATE = var.profiling_sample_rate
+      PROFILING_OUTPUT      = "s3://${aws_s3_bucket.zip_uploads.bucket}/profiles"
     }
   }
 }
@@ -35,6 +40,13 @@ resource "aws_lambda_function" "zip_processor" {
     variables = {
       EXTRACTED_BUCKET_NAME = aws_s3_bucket.extracted_files.bucket
       PREFIX                = "tabs"
+      LEDGER_LOCATION       = "s3://${aws_s3_bucket.zip_uploads.bucket}/ledger"
+      ARCHIVE_MODE          = "extract"
+      ARCHIVE_PREFIX        = "archives"
+      LISTING_MARKER_BUCKET = aws_s3_bucket.zip_uploads.bucket
+      PROFILING_ENABLED     = var.profiling_enabled
+      PROFILING_SAMPLE_RATE = var.profiling_sample_rate
+      PROFILING_OUTPUT      = "s3://${aws_s3_bucket.zip_uploads.bucket}/profiles"
     }
   }
 }
@@ -54,6 +66,53 @@ resource "aws_lambda_function" "metadata_updater" {
       ZIP_BUCKET_NAME       = aws_s3_bucket.zip_uploads.bucket
       EXTRACTED_BUCKET_NAME = aws_s3_bucket.extracted_files.bucket
       ADMIN_GROUP_NAME      = aws_cognito_user_group.admin.name
+      PROFILING_ENABLED     = var.profiling_enabled
+      PROFILING_SAMPLE_RATE = var.profiling_sample_rate
+      PROFILING_OUTPUT      = "s3://${aws_s3_bucket.zip_uploads.bucket}/profiles"
+    }
+  }
+}
+
+# Archive Reader Lambda Function
+resource "aws_lambda_function" "archive_reader" {
+  filename         = "archive_reader.zip"
+  function_name    = "${var.project_name}-archive-reader"
+  source_code_hash = filebase64sha256("archive_reader.zip")
+  role             = aws_iam_role.lambda_role.arn
+  handler          = "archive_reader.lambda_handler"
+  runtime          = "python3.13"
+  timeout          = 30
+  memory_size      = 512
+
+  environment {
+    variables = {
+      EXTRACTED_BUCKET_NAME = aws_s3_bucket.extracted_files.bucket
+      ARCHIVE_PREFIX        = "archives"
+      PROFILING_ENABLED     = var.profiling_enabled
+      PROFILING_SAMPLE_RATE = var.profiling_sample_rate
+      PROFILING_OUTPUT      = "s3://${aws_s3_bucket.zip_uploads.bucket}/profiles"
+    }
+  }
+}
+
+# Folder Lister Lambda Function
+resource "aws_lambda_function" "folder_lister" {
+  filename         = "folder_lister.zip"
+  function_name    = "${var.project_name}-folder-lister"
+  source_code_hash = filebase64sha256("folder_lister.zip")
+  role             = aws_iam_role.lambda_role.arn
+  handler          = "folder_lister.lambda_handler"
+  runtime          = "python3.13"
+  timeout          = 30
+
+  environment {
+    variables = {
+      EXTRACTED_BUCKET_NAME = aws_s3_bucket.extracted_files.bucket
+      LISTING_ROOT          = "tabs"
+      LISTING_MARKER_BUCKET = aws_s3_bucket.zip_uploads.bucket
+      PROFILING_ENABLED     = var.profiling_enabled
+      PROFILING_SAMPLE_RATE = var.profiling_sample_rate
+      PROFILING_OUTPUT      = "s3://${aws_s3_bucket.zip_uploads.bucket}/profiles"
     }
   }
 }
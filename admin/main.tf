@@ -274,7 +274,8 @@ resource "aws_iam_role_policy" "lambda_policy" {
           "s3:PutObject",
           "s3:CopyObject",
           "s3:DeleteObject",
-          "s3:ListBucket"
+          "s3:ListBucket",
+          "s3:AbortMultipartUpload"
         ]
         Resource = [
           aws_s3_bucket.zip_uploads.arn,
@@ -282,6 +283,11 @@ resource "aws_iam_role_policy" "lambda_policy" {
           aws_s3_bucket.extracted_files.arn,
           "${aws_s3_bucket.extracted_files.arn}/*"
         ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["lambda:InvokeFunction"]
+        Resource = aws_lambda_function.file_manager.arn
       }
     ]
   })
@@ -293,10 +299,11 @@ resource "aws_apigatewayv2_api" "main" {
   protocol_type = "HTTP"
 
   cors_configuration {
-    allow_headers = ["*"]
-    allow_methods = ["*"]
-    allow_origins = ["https://14strings.com"]
-    max_age       = 300
+    allow_headers  = ["*"]
+    allow_methods  = ["*"]
+    allow_origins  = ["https://14strings.com"]
+    expose_headers = ["ETag"]
+    max_age        = 300
   }
 }
 
@@ -352,6 +359,22 @@ resource "aws_apigatewayv2_integration" "metadata_updater" {
   integration_method = "POST"
 }
 
+# API Gateway Lambda Integration for archive reader
+resource "aws_apigatewayv2_integration" "archive_reader" {
+  api_id             = aws_apigatewayv2_api.main.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.archive_reader.invoke_arn
+  integration_method = "POST"
+}
+
+# API Gateway Lambda Integration for folder lister
+resource "aws_apigatewayv2_integration" "folder_lister" {
+  api_id             = aws_apigatewayv2_api.main.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.folder_lister.invoke_arn
+  integration_method = "POST"
+}
+
 # API Gateway Route for presigned URL generation
 resource "aws_apigatewayv2_route" "get_presigned_url" {
   api_id    = aws_apigatewayv2_api.main.id
@@ -370,6 +393,15 @@ resource "aws_apigatewayv2_route" "delete_folder" {
   #  authorizer_id     = aws_apigatewayv2_authorizer.cognito.id
 }
 
+# API Gateway Route for folder move/rename
+resource "aws_apigatewayv2_route" "move_folder" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /folder/{folder_name}/move"
+  target    = "integrations/${aws_apigatewayv2_integration.file_manager.id}"
+  #  authorization_type = "JWT"
+  #  authorizer_id     = aws_apigatewayv2_authorizer.cognito.id
+}
+
 # API Gateway Route for file deletion
 resource "aws_apigatewayv2_route" "delete_file" {
   api_id    = aws_apigatewayv2_api.main.id
@@ -388,6 +420,20 @@ resource "aws_apigatewayv2_route" "update_metadata" {
   #  authorizer_id     = aws_apigatewayv2_authorizer.cognito.id
 }
 
+# API Gateway Route for reading members of indexed archives
+resource "aws_apigatewayv2_route" "get_archive_member" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /archive"
+  target    = "integrations/${aws_apigatewayv2_integration.archive_reader.id}"
+}
+
+# API Gateway Route for paginated folder listing
+resource "aws_apigatewayv2_route" "list_folder" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /folders"
+  target    = "integrations/${aws_apigatewayv2_integration.folder_lister.id}"
+}
+
 # API Gateway Stage
 resource "aws_apigatewayv2_stage" "main" {
   api_id      = aws_apigatewayv2_api.main.id
@@ -432,3 +478,21 @@ resource "aws_lambda_permission" "api_gateway_invoke_metadata_updater" {
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
 }
+
+# Lambda permission for API Gateway to invoke archive reader
+resource "aws_lambda_permission" "api_gateway_invoke_archive_reader" {
+  statement_id  = "AllowExecutionFromAPIGateway"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.archive_reader.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
+# Lambda permission for API Gateway to invoke folder lister
+resource "aws_lambda_permission" "api_gateway_invoke_folder_lister" {
+  statement_id  = "AllowExecutionFromAPIGateway"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.folder_lister.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
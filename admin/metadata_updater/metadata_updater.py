@@ -3,7 +3,9 @@ import boto3
 import os
 import re
 import jwt
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from profiling import profiled
 
 s3_client = boto3.client('s3')
 
@@ -17,6 +19,13 @@ CORS_HEADERS = {
     'Access-Control-Allow-Credentials': 'true'
 }
 
+# Sparse order keys: images are spaced ORDER_KEY_GAP apart so a move only
+# rewrites the moved object; the folder is rebalanced when a gap runs out
+ORDER_KEY_GAP = 65536
+REBALANCE_MAX_WORKERS = 16
+# Only images are ordered by the roster (see fetchImagesFromS3 in roster.js)
+ORDERED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+
 # Validation patterns
 BUCKET_NAME_PATTERN = r'^[a-z0-9]([a-z0-9.-]*[a-z0-9])?$'
 IP_ADDRESS_PATTERN = r'^\d+\.\d+\.\d+\.\d+$'
@@ -83,6 +92,153 @@ def validate_object_key(object_key):
     
     return True
 
+def folder_of(object_key):
+    """
+    Return the folder prefix (with trailing slash) an object key belongs to
+    """
+    return object_key.rsplit('/', 1)[0] + '/' if '/' in object_key else ''
+
+def validate_move_between(move_between, object_key):
+    """
+    Validate the neighbour keys of a move; either may be null at the ends of the list,
+    and neither may be the moved object itself or live in another folder
+    """
+    if not isinstance(move_between, dict):
+        return False
+    
+    for side in ('after', 'before'):
+        key = move_between.get(side)
+        if key is None:
+            continue
+        if not (isinstance(key, str) and validate_object_key(key)):
+            return False
+        if key == object_key or folder_of(key) != folder_of(object_key):
+            return False
+    
+    return True
+
+def parse_order_key(value):
+    """
+    Parse a position metadata value, returning None if it is missing or invalid
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def order_key_between(after_position, before_position):
+    """
+    Pick an order key between two neighbours (None for the start or end of the
+    list), returning None if there is no room left between them
+    """
+    if after_position is None and before_position is None:
+        return ORDER_KEY_GAP
+    if after_position is None:
+        return before_position - ORDER_KEY_GAP
+    if before_position is None:
+        return after_position + ORDER_KEY_GAP
+    if before_position - after_position < 2:
+        return None
+    return (after_position + before_position) // 2
+
+def update_object_metadata(bucket_name, object_key, head_response, metadata):
+    """
+    Copy an object to itself with its existing metadata merged with the new metadata
+    """
+    existing_metadata = head_response.get('Metadata', {})
+    updated_metadata = {**existing_metadata, **metadata}
+    
+    # Copy object to itself with updated metadata
+    copy_source = {'Bucket': bucket_name, 'Key': object_key}
+    
+    # Prepare copy parameters
+    copy_params = {
+        'Bucket': bucket_name,
+        'Key': object_key,
+        'CopySource': copy_source,
+        'Metadata': updated_metadata,
+        'MetadataDirective': 'REPLACE'
+    }
+    
+    # Preserve content type if it exists
+    if 'ContentType' in head_response:
+        copy_params['ContentType'] = head_response['ContentType']
+    
+    # Perform the copy operation
+    s3_client.copy_object(**copy_params)
+    return updated_metadata
+
+def rebalance_order_keys(bucket_name, object_key):
+    """
+    Respace the order keys of every image in the folder of object_key,
+    keeping their current order. Returns the new position of each key.
+    The object being moved is left out since it is rewritten by the caller.
+    """
+    folder_prefix = folder_of(object_key)
+    paginator = s3_client.get_paginator('list_objects_v2')
+    keys = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=folder_prefix, Delimiter='/'):
+        for obj in page.get('Contents', []):
+            if obj['Key'] != object_key and obj['Key'].lower().endswith(ORDERED_EXTENSIONS):
+                keys.append(obj['Key'])
+
+    with ThreadPoolExecutor(max_workers=REBALANCE_MAX_WORKERS) as executor:
+        heads = dict(zip(keys, executor.map(lambda key: s3_client.head_object(Bucket=bucket_name, Key=key), keys)))
+
+    # Objects without a position sort to the end, as they do in the roster
+    def sort_key(key):
+        position = parse_order_key(heads[key].get('Metadata', {}).get('position'))
+        return (position is None, position or 0, key)
+
+    positions = {}
+    changed = []
+    for index, key in enumerate(sorted(keys, key=sort_key)):
+        positions[key] = (index + 1) * ORDER_KEY_GAP
+        if parse_order_key(heads[key].get('Metadata', {}).get('position')) != positions[key]:
+            changed.append(key)
+
+    with ThreadPoolExecutor(max_workers=REBALANCE_MAX_WORKERS) as executor:
+        list(executor.map(
+            lambda key: update_object_metadata(bucket_name, key, heads[key], {'position': str(positions[key])}),
+            changed
+        ))
+
+    print(f"Rebalanced order keys in {folder_prefix}: {len(changed)} of {len(keys)} objects rewritten")
+    return positions
+
+def assign_order_key(bucket_name, object_key, after_key, before_key):
+    """
+    Compute the position for object_key placed between after_key and before_key
+    (either may be None), rebalancing the folder only if there is no gap left.
+    Returns the position and whether a rebalance happened; the position is None
+    if a neighbour no longer exists or no key can be placed between them.
+    """
+    def neighbour_position(key):
+        if not key:
+            return None
+        head_response = s3_client.head_object(Bucket=bucket_name, Key=key)
+        return parse_order_key(head_response.get('Metadata', {}).get('position'))
+
+    try:
+        after_position = neighbour_position(after_key)
+        before_position = neighbour_position(before_key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            return None, False
+        raise
+
+    position = None
+    if (after_key is None or after_position is not None) and (before_key is None or before_position is not None):
+        position = order_key_between(after_position, before_position)
+    if position is not None:
+        return position, False
+
+    positions = rebalance_order_keys(bucket_name, object_key)
+    if (after_key and after_key not in positions) or (before_key and before_key not in positions):
+        return None, True
+    return order_key_between(positions.get(after_key), positions.get(before_key)), True
+
+@profiled
 def lambda_handler(event, context):
     """
     Lambda handler to update metadata of S3 objects.
@@ -91,6 +247,8 @@ def lambda_handler(event, context):
     - bucket_name: S3 bucket name
     - object_key: Key of the object to update
     - metadata: Dictionary of metadata key-value pairs to apply
+    - move_between: Optional {"after": key, "before": key} naming the object's new
+      neighbours (null at either end); a position between them is assigned
     """
     try:
         # Verify admin group membership
@@ -106,6 +264,7 @@ def lambda_handler(event, context):
         bucket_name = body.get('bucket_name', '').strip()
         object_key = body.get('object_key', '').strip()
         metadata = body.get('metadata', {})
+        move_between = body.get('move_between')
         
         # Validate required parameters
         if not bucket_name:
@@ -129,6 +288,21 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'metadata must be a dictionary'})
             }
         
+        if move_between is not None and not validate_move_between(move_between, object_key):
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'move_between must name other objects in the same folder as object_key'})
+            }
+        
+        # Positions are sparse integer order keys; anything else breaks the sort
+        if 'position' in metadata and parse_order_key(metadata['position']) is None:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'position must be an integer'})
+            }
+        
         # Validate bucket name
         if not validate_bucket_name(bucket_name):
             return {
@@ -160,28 +334,23 @@ def lambda_handler(event, context):
                 }
             raise
         
-        # Merge existing metadata with new metadata
-        existing_metadata = head_response.get('Metadata', {})
-        updated_metadata = {**existing_metadata, **metadata}
-        
-        # Copy object to itself with updated metadata
-        copy_source = {'Bucket': bucket_name, 'Key': object_key}
-        
-        # Prepare copy parameters
-        copy_params = {
-            'Bucket': bucket_name,
-            'Key': object_key,
-            'CopySource': copy_source,
-            'Metadata': updated_metadata,
-            'MetadataDirective': 'REPLACE'
-        }
-        
-        # Preserve content type if it exists
-        if 'ContentType' in head_response:
-            copy_params['ContentType'] = head_response['ContentType']
+        # Assign a sparse order key between the new neighbours
+        rebalanced = False
+        if move_between is not None:
+            position, rebalanced = assign_order_key(
+                bucket_name, object_key, move_between.get('after'), move_between.get('before'))
+            if position is None:
+                return {
+                    'statusCode': 409,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({
+                        'error': 'Could not place the object between its neighbours; reload the folder and retry',
+                        'rebalanced': rebalanced
+                    })
+                }
+            metadata = {**metadata, 'position': str(position)}
         
-        # Perform the copy operation
-        s3_client.copy_object(**copy_params)
+        updated_metadata = update_object_metadata(bucket_name, object_key, head_response, metadata)
         
         return {
             'statusCode': 200,
@@ -190,7 +359,8 @@ def lambda_handler(event, context):
                 'message': f'Successfully updated metadata for {object_key}',
                 'bucket': bucket_name,
                 'object_key': object_key,
-                'metadata': updated_metadata
+                'metadata': updated_metadata,
+                'rebalanced': rebalanced
             })
         }
         
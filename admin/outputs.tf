@@ -18,6 +18,11 @@ output "api_gateway_url" {
   value       = aws_apigatewayv2_api.main.api_endpoint
 }
 
+output "folder_listing_url" {
+  description = "Folder listing endpoint for the browse page"
+  value       = "${aws_apigatewayv2_api.main.api_endpoint}/prod/folders"
+}
+
 output "zip_uploads_bucket" {
   description = "S3 bucket for zip uploads"
   value       = aws_s3_bucket.zip_uploads.bucket
@@ -34,3 +34,15 @@ variable "admin_temporary_password" {
   default     = "harigoshi"
   sensitive   = true
 }
+
+variable "profiling_enabled" {
+  description = "Capture cProfile and tracemalloc artifacts for sampled Lambda invocations"
+  type        = bool
+  default     = false
+}
+
+variable "profiling_sample_rate" {
+  description = "Fraction of invocations to profile when profiling is enabled"
+  type        = number
+  default     = 0.1
+}
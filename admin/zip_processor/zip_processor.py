@@ -3,15 +3,39 @@ import boto3
 import zipfile
 import os
 import io
+import hashlib
+import csv
+import re
+import base64
+import time
+from datetime import datetime
 from urllib.parse import unquote_plus
 from botocore.exceptions import ClientError
+from profiling import profiled
+from content_types import get_content_type
+from archive_index import build_archive_index
+from listing_generation import bump_listing_generation
 
 # Environment variables
 EXTRACTED_BUCKET_NAME = os.environ['EXTRACTED_BUCKET_NAME']
 PREFIX = os.environ['PREFIX']
+# Idempotency ledger: either s3://bucket/prefix or a local directory
+LEDGER_LOCATION = os.environ.get('LEDGER_LOCATION', '/tmp/ledger')
+# 'extract' writes every member as its own object; 'indexed' keeps the zip and writes an index
+ARCHIVE_MODE = os.environ.get('ARCHIVE_MODE', 'extract')
+ARCHIVE_PREFIX = os.environ.get('ARCHIVE_PREFIX', 'archives')
+# Optional files at the root of a zip (or of its single top-level directory)
+# mapping member paths to metadata (e.g. caption, position)
+SIDECAR_FILENAMES = os.environ.get('SIDECAR_FILENAMES', 'metadata.json,metadata.csv').split(',')
+
+# S3 allows 2KB of user metadata per object, counting keys and values
+USER_METADATA_LIMIT = 2048
+# Metadata keys are sent as x-amz-meta-<key> headers, so must be header tokens
+METADATA_KEY_PATTERN = r"^[a-z0-9!#$%&'*+.^_`|~-]+$"
 
 s3_client = boto3.client('s3')
 
+@profiled
 def lambda_handler(event, context):
     """
     Process zip files uploaded to S3 by extracting them to the extracted files bucket
@@ -24,6 +48,15 @@ def lambda_handler(event, context):
             source_key = unquote_plus(record['s3']['object']['key'])
             
             print(f"Processing zip file: {source_key} from bucket: {source_bucket}")
+
+            # Claim the event before anything else, keyed by the record alone so
+            # duplicate and concurrent deliveries are acknowledged even after the
+            # first run has deleted the zip
+            etag = record['s3']['object'].get('eTag', '').strip('"')
+            claim_path = event_claim_path(
+                source_bucket, source_key, etag or record['s3']['object'].get('sequencer', ''))
+            if not claim_event(claim_path, source_bucket, source_key, context):
+                continue
             
             # Get object metadata to determine target folder
             try:
@@ -31,6 +64,7 @@ def lambda_handler(event, context):
                 metadata = metadata_response.get('Metadata', {})
                 target_folder = metadata.get('target-folder', 'default')
                 original_filename = metadata.get('original-filename', source_key)
+                archive_mode = metadata.get('archive-mode', ARCHIVE_MODE)
                 
                 print(f"Target folder: {target_folder}")
                 print(f"Original filename: {original_filename}")
@@ -39,24 +73,64 @@ def lambda_handler(event, context):
                 print(f"Error getting object metadata: {str(e)}")
                 target_folder = 'default'
                 original_filename = source_key
-            
+                archive_mode = ARCHIVE_MODE
+
             # Download the zip file from S3
             try:
+                # Identical re-upload already extracted to this folder
+                if etag and find_completed_extraction(target_folder, 'etag', etag, archive_mode):
+                    print(f"Zip file {source_key} with ETag {etag} already extracted to {target_folder}; skipping")
+                    delete_source_zip(source_bucket, source_key)
+                    complete_event(claim_path)
+                    continue
+
                 zip_obj = s3_client.get_object(Bucket=source_bucket, Key=source_key)
                 zip_content = zip_obj['Body'].read()
+
+                # Byte-identical archive uploaded with a different ETag (e.g. multipart)
+                digest = hashlib.sha256(zip_content).hexdigest()
+                if find_completed_extraction(target_folder, 'sha256', digest, archive_mode):
+                    print(f"Zip file {source_key} with digest {digest} already extracted to {target_folder}; skipping")
+                    delete_source_zip(source_bucket, source_key)
+                    complete_event(claim_path)
+                    continue
                 
                 # Process the zip file
-                extract_zip_file(zip_content, target_folder, original_filename)
+                if archive_mode == 'indexed':
+                    extracted_keys, failed_files = store_indexed_archive(
+                        zip_content, source_bucket, source_key, target_folder, original_filename)
+                else:
+                    extracted_keys, failed_files = extract_zip_file(zip_content, target_folder, original_filename)
+                bump_listing_generation()
+
+                # A partial extraction is neither recorded nor deleted, and its
+                # claim is released, so uploading the zip again retries it
+                if failed_files:
+                    print(f"Keeping zip file {source_key}: {len(failed_files)} files failed to extract")
+                    release_event(claim_path)
+                    continue
+
+                record_completed_extraction(target_folder, {
+                    'etag': etag,
+                    'sha256': digest,
+                    'source-key': source_key,
+                    'original-filename': original_filename,
+                    'archive-mode': archive_mode,
+                    'extracted-at': datetime.utcnow().isoformat(),
+                    'extracted-keys': extracted_keys
+                })
                 
                 # Delete the original zip file after successful extraction
-                s3_client.delete_object(Bucket=source_bucket, Key=source_key)
-                print(f"Successfully deleted original zip file: {source_key}")
+                delete_source_zip(source_bucket, source_key)
+                complete_event(claim_path)
                 
             except ClientError as e:
                 print(f"Error processing zip file {source_key}: {str(e)}")
+                release_event(claim_path)
                 continue
             except Exception as e:
                 print(f"Unexpected error processing zip file {source_key}: {str(e)}")
+                release_event(claim_path)
                 continue
         
         return {
@@ -71,9 +145,375 @@ def lambda_handler(event, context):
             'body': json.dumps(f'Error processing zip files: {str(e)}')
         }
 
+def delete_source_zip(source_bucket, source_key):
+    """
+    Delete the uploaded zip file once it has been extracted
+    """
+    s3_client.delete_object(Bucket=source_bucket, Key=source_key)
+    print(f"Successfully deleted original zip file: {source_key}")
+
+def ledger_entry_path(target_folder, kind, value):
+    """
+    Ledger entries live under the target folder so each archive is tracked per destination
+    """
+    return f"{target_folder.strip('/')}/{kind}-{value}.json"
+
+def ledger_s3_location(path):
+    """
+    Split an s3:// ledger location into the bucket and key for a ledger entry
+    """
+    bucket, _, prefix = LEDGER_LOCATION[len('s3://'):].partition('/')
+    return bucket, f"{prefix.rstrip('/')}/{path}" if prefix else path
+
+def read_ledger_object(path):
+    """
+    Read a ledger entry and its version (the S3 ETag, None for a local ledger),
+    returning (None, None) if it does not exist
+    """
+    if LEDGER_LOCATION.startswith('s3://'):
+        bucket, key = ledger_s3_location(path)
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return None, None
+            raise
+        return json.loads(response['Body'].read()), response.get('ETag')
+
+    local_path = os.path.join(LEDGER_LOCATION, path)
+    if not os.path.exists(local_path):
+        return None, None
+    with open(local_path) as f:
+        return json.load(f), None
+
+def read_ledger_entry(path):
+    """
+    Read a ledger entry, returning None if it does not exist
+    """
+    return read_ledger_object(path)[0]
+
+def write_ledger_entry(path, entry, if_none_match=False, if_match=None):
+    """
+    Write a ledger entry to S3 or the local directory. With if_none_match the
+    entry is only created if it does not exist yet, and with if_match only
+    replaced if it is still at that version; returns False if the condition failed.
+    """
+    body = json.dumps(entry)
+    if LEDGER_LOCATION.startswith('s3://'):
+        bucket, key = ledger_s3_location(path)
+        put_params = {'Bucket': bucket, 'Key': key, 'Body': body.encode('utf-8'), 'ContentType': 'application/json'}
+        if if_none_match:
+            put_params['IfNoneMatch'] = '*'
+        elif if_match:
+            put_params['IfMatch'] = if_match
+        try:
+            s3_client.put_object(**put_params)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('PreconditionFailed', 'ConditionalRequestConflict', '412', '409'):
+                return False
+            raise
+        return True
+
+    local_path = os.path.join(LEDGER_LOCATION, path)
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    try:
+        with open(local_path, 'x' if if_none_match else 'w') as f:
+            f.write(body)
+    except FileExistsError:
+        return False
+    return True
+
+def delete_ledger_entry(path):
+    """
+    Delete a ledger entry from S3 or the local directory, if it exists
+    """
+    if LEDGER_LOCATION.startswith('s3://'):
+        bucket, key = ledger_s3_location(path)
+        s3_client.delete_object(Bucket=bucket, Key=key)
+        return
+
+    local_path = os.path.join(LEDGER_LOCATION, path)
+    if os.path.exists(local_path):
+        os.remove(local_path)
+
+def event_claim_path(source_bucket, source_key, etag):
+    """
+    Event claims are keyed by the source object and its ETag from the event record
+    """
+    return f"events/{source_bucket}/{source_key.strip('/')}/etag-{etag}.json"
+
+def source_zip_exists(source_bucket, source_key):
+    """
+    Return True if the uploaded zip file is still in the uploads bucket
+    """
+    try:
+        s3_client.head_object(Bucket=source_bucket, Key=source_key)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return False
+        raise
+
+def claim_event(claim_path, source_bucket, source_key, context):
+    """
+    Claim an S3 event before processing it. Returns False if the event is
+    being handled by another invocation, or was handled already and its zip is
+    gone. A claim expires when the invocation holding it would have timed out,
+    so an event whose handler died can be retried.
+    """
+    now = time.time()
+    remaining_seconds = context.get_remaining_time_in_millis() / 1000 if context else 900
+    claim = {'status': 'claimed', 'source-key': source_key, 'expires-at': now + remaining_seconds}
+
+    try:
+        if write_ledger_entry(claim_path, claim, if_none_match=True):
+            return True
+
+        entry, version = read_ledger_object(claim_path)
+        if entry is None:
+            # Released since the write above; claim it afresh
+            return write_ledger_entry(claim_path, claim, if_none_match=True)
+
+        if entry.get('status') != 'completed' and entry.get('expires-at', 0) > now:
+            print(f"Zip file {source_key} is being processed by another invocation; skipping")
+            return False
+
+        if not source_zip_exists(source_bucket, source_key):
+            print(f"Zip file {source_key} was already processed; acknowledging duplicate event")
+            return False
+
+        # Uploaded again after completing, or abandoned by an invocation that died
+        if not write_ledger_entry(claim_path, claim, if_match=version):
+            print(f"Zip file {source_key} was claimed by another invocation; skipping")
+            return False
+        return True
+
+    except Exception as e:
+        print(f"Error claiming event, processing without a claim: {str(e)}")
+        return True
+
+def complete_event(claim_path):
+    """
+    Mark a claimed event as completed so duplicate deliveries are acknowledged
+    """
+    try:
+        write_ledger_entry(claim_path, {'status': 'completed', 'completed-at': datetime.utcnow().isoformat()})
+    except Exception as e:
+        print(f"Error completing event claim: {str(e)}")
+
+def release_event(claim_path):
+    """
+    Release the claim on an event that did not complete, so it can be retried
+    """
+    try:
+        delete_ledger_entry(claim_path)
+    except Exception as e:
+        print(f"Error releasing event claim: {str(e)}")
+
+def find_completed_extraction(target_folder, kind, value, archive_mode):
+    """
+    Return True if the ledger records this archive as extracted to the target
+    folder in the same mode and the extracted files are still there
+    """
+    try:
+        entry = read_ledger_entry(ledger_entry_path(target_folder, kind, value))
+        if entry is None or entry.get('archive-mode', 'extract') != archive_mode:
+            return False
+
+        # The folder may have been deleted or moved since; check one extracted file
+        extracted_keys = entry.get('extracted-keys', [])
+        if extracted_keys:
+            try:
+                s3_client.head_object(Bucket=EXTRACTED_BUCKET_NAME, Key=extracted_keys[0])
+            except ClientError:
+                print(f"Ledger entry for {kind} {value} is stale; extracting again")
+                return False
+        return True
+
+    except Exception as e:
+        print(f"Error reading idempotency ledger: {str(e)}")
+        return False
+
+def record_completed_extraction(target_folder, entry):
+    """
+    Record a completed extraction under both its ETag and content digest
+    """
+    try:
+        if entry['etag']:
+            write_ledger_entry(ledger_entry_path(target_folder, 'etag', entry['etag']), entry)
+        write_ledger_entry(ledger_entry_path(target_folder, 'sha256', entry['sha256']), entry)
+    except Exception as e:
+        print(f"Error writing idempotency ledger: {str(e)}")
+
+def store_indexed_archive(zip_content, source_bucket, source_key, target_folder, original_filename):
+    """
+    Keep the zip file in the extracted files bucket alongside a binary index of
+    its members, so single members can be served with a ranged read
+    """
+    try:
+        archive_key = f"{ARCHIVE_PREFIX}/{target_folder}/{original_filename}".replace('\\', '/').replace('//', '/')
+        index_key = f"{archive_key}.idx"
+
+        # Server-side copy of the uploaded zip; no need to upload its bytes again
+        copy_response = s3_client.copy_object(
+            Bucket=EXTRACTED_BUCKET_NAME,
+            Key=archive_key,
+            CopySource={'Bucket': source_bucket, 'Key': source_key},
+            ContentType='application/zip',
+            Metadata={
+                'source-zip': original_filename,
+                'extracted-from': target_folder
+            },
+            MetadataDirective='REPLACE'
+        )
+
+        # The index records which copy of the archive its offsets belong to
+        index_content = build_archive_index(
+            zip_content,
+            copy_response['CopyObjectResult']['ETag'],
+            include_member=lambda path: not any(part.startswith('.') for part in path.split('/'))
+        )
+        s3_client.put_object(
+            Bucket=EXTRACTED_BUCKET_NAME,
+            Key=index_key,
+            Body=index_content,
+            ContentType='application/octet-stream',
+            Metadata={
+                'source-zip': original_filename,
+                'extracted-from': target_folder
+            }
+        )
+
+        print(f"Stored indexed archive: {archive_key} ({len(index_content)} byte index)")
+        return [archive_key, index_key], []
+
+    except zipfile.BadZipFile:
+        print("Error: Invalid or corrupted zip file")
+        raise Exception("Invalid or corrupted zip file")
+
+def normalize_member_path(path):
+    """
+    Normalize a member path as written in a sidecar file to match zip member names
+    """
+    path = path.strip().replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path.lstrip('/')
+
+def sidecar_metadata_value(value):
+    """
+    Return a metadata value S3 can store in a header: printable ASCII as is,
+    anything else RFC 2047-encoded
+    """
+    if all(32 <= ord(char) < 127 for char in value):
+        return value
+    return '=?UTF-8?B?' + base64.b64encode(value.encode('utf-8')).decode('ascii') + '?='
+
+def clean_sidecar_metadata(path, metadata):
+    """
+    Keep the sidecar entries that can be stored as S3 user metadata, logging
+    and dropping the rest
+    """
+    cleaned = {}
+    for key, value in metadata.items():
+        key = str(key).strip().lower()
+        if not key or value is None or isinstance(value, (dict, list)) or str(value) == '':
+            continue
+        if not re.match(METADATA_KEY_PATTERN, key):
+            print(f"Dropping sidecar key {key!r} for {path}: not a valid metadata key")
+            continue
+        value = str(value).strip()
+        if key == 'position':
+            try:
+                value = str(int(value))
+            except ValueError:
+                print(f"Dropping sidecar position {value!r} for {path}: not an integer")
+                continue
+        cleaned[key] = sidecar_metadata_value(value)
+    return cleaned
+
+def metadata_size(metadata):
+    """
+    Size of user metadata as S3 counts it: the UTF-8 bytes of every key and value
+    """
+    return sum(len(key.encode('utf-8')) + len(value.encode('utf-8')) for key, value in metadata.items())
+
+def fit_sidecar_metadata(path, sidecar_metadata, base_metadata):
+    """
+    Drop sidecar entries, largest first, until they fit in the user metadata
+    budget alongside the metadata written for every extracted file
+    """
+    fitted = dict(sidecar_metadata)
+    while fitted and metadata_size({**fitted, **base_metadata}) > USER_METADATA_LIMIT:
+        key = max(fitted, key=lambda name: metadata_size({name: fitted[name]}))
+        print(f"Dropping sidecar key {key!r} for {path}: metadata exceeds {USER_METADATA_LIMIT} bytes")
+        del fitted[key]
+    return fitted
+
+def find_sidecar(names):
+    """
+    Return the sidecar member name and the directory its paths are relative to.
+    The sidecar may sit at the root of the zip or, when every member is inside
+    one top-level directory, at the root of that directory.
+    """
+    for sidecar_name in SIDECAR_FILENAMES:
+        if sidecar_name in names:
+            return sidecar_name, ''
+
+    top_level = {
+        name.split('/', 1)[0] for name in names
+        if not any(part.startswith('.') for part in name.split('/'))
+    }
+    if len(top_level) == 1:
+        directory = top_level.pop() + '/'
+        for sidecar_name in SIDECAR_FILENAMES:
+            if directory + sidecar_name in names:
+                return directory + sidecar_name, directory
+
+    return None, ''
+
+def read_sidecar_metadata(zip_ref):
+    """
+    Read the optional sidecar file from the zip and return its member name
+    (None if there is none) and a dictionary of member path -> metadata.
+    JSON sidecars map paths to objects; CSV sidecars have a 'path' column and
+    one column per metadata key.
+    """
+    sidecar_name, directory = find_sidecar(set(zip_ref.namelist()))
+    if sidecar_name:
+        try:
+            content = zip_ref.read(sidecar_name).decode('utf-8-sig')
+            if sidecar_name.lower().endswith('.csv'):
+                rows = {}
+                for row in csv.DictReader(io.StringIO(content)):
+                    path = row.pop('path', None)
+                    if path:
+                        rows[path] = row
+            else:
+                rows = json.loads(content)
+                if not isinstance(rows, dict):
+                    raise ValueError("JSON sidecar must be an object of path -> metadata")
+
+            sidecar = {}
+            for path, metadata in rows.items():
+                if not isinstance(metadata, dict):
+                    continue
+                member_path = directory + normalize_member_path(path)
+                sidecar[member_path] = clean_sidecar_metadata(member_path, metadata)
+
+            print(f"Read metadata for {len(sidecar)} files from sidecar {sidecar_name}")
+            return sidecar_name, sidecar
+
+        except Exception as e:
+            print(f"Error reading sidecar {sidecar_name}, extracting without it: {str(e)}")
+            return sidecar_name, {}
+
+    return None, {}
+
 def extract_zip_file(zip_content, target_folder, original_filename):
     """
-    Extract zip file contents to the extracted files bucket
+    Extract zip file contents to the extracted files bucket, returning the keys
+    written and the member paths that failed
     """
     try:
         # Create a BytesIO object from the zip content
@@ -84,6 +524,11 @@ def extract_zip_file(zip_content, target_folder, original_filename):
             # Get list of all files in the zip
             file_list = zip_ref.namelist()
             print(f"Zip file contains {len(file_list)} files/folders")
+            extracted_keys = []
+            failed_files = []
+
+            # Captions, positions etc. applied as each file is written
+            sidecar_name, sidecar = read_sidecar_metadata(zip_ref)
             
             # Process each file in the zip
             for file_info in zip_ref.infolist():
@@ -97,6 +542,10 @@ def extract_zip_file(zip_content, target_folder, original_filename):
                 if any(part.startswith('.') for part in file_path.split('/')):
                     print(f"Skipping hidden/system file: {file_path}")
                     continue
+
+                # The sidecar itself is not extracted
+                if file_path == sidecar_name:
+                    continue
                 
                 # Construct the S3 key preserving directory structure
                 s3_key = f"{target_folder}/{file_path}"
@@ -112,27 +561,46 @@ def extract_zip_file(zip_content, target_folder, original_filename):
                     # Determine content type based on file extension
                     content_type = get_content_type(file_path)
                     
+                    base_metadata = {
+                        'source-zip': original_filename,
+                        'extracted-from': target_folder,
+                        'original-path': file_path,
+                        'file-size': str(len(file_content))
+                    }
+                    sidecar_metadata = fit_sidecar_metadata(file_path, sidecar.get(file_path, {}), base_metadata)
+                    
                     # Upload to S3
-                    s3_client.put_object(
-                        Bucket=EXTRACTED_BUCKET_NAME,
-                        Key=s3_key,
-                        Body=file_content,
-                        ContentType=content_type,
-                        Metadata={
-                            'source-zip': original_filename,
-                            'extracted-from': target_folder,
-                            'original-path': file_path,
-                            'file-size': str(len(file_content))
-                        }
-                    )
+                    try:
+                        s3_client.put_object(
+                            Bucket=EXTRACTED_BUCKET_NAME,
+                            Key=s3_key,
+                            Body=file_content,
+                            ContentType=content_type,
+                            Metadata={**sidecar_metadata, **base_metadata}
+                        )
+                    except ClientError as e:
+                        if not sidecar_metadata:
+                            raise
+                        # Sidecar values must never cost the file itself
+                        print(f"Error writing {file_path} with sidecar metadata, retrying without it: {str(e)}")
+                        s3_client.put_object(
+                            Bucket=EXTRACTED_BUCKET_NAME,
+                            Key=s3_key,
+                            Body=file_content,
+                            ContentType=content_type,
+                            Metadata=base_metadata
+                        )
                     
+                    extracted_keys.append(s3_key)
                     print(f"Successfully extracted: {file_path} -> {s3_key}")
                     
                 except Exception as e:
                     print(f"Error extracting file {file_path}: {str(e)}")
+                    failed_files.append(file_path)
                     continue
         
         print(f"Zip extraction completed for target folder: {target_folder}")
+        return extracted_keys, failed_files
         
     except zipfile.BadZipFile:
         print("Error: Invalid or corrupted zip file")
@@ -140,83 +608,3 @@ def extract_zip_file(zip_content, target_folder, original_filename):
     except Exception as e:
         print(f"Error extracting zip file: {str(e)}")
         raise
-
-def get_content_type(filename):
-    """
-    Determine content type based on file extension
-    """
-    extension = filename.lower().split('.')[-1] if '.' in filename else ''
-    
-    content_types = {
-        # Text files
-        'txt': 'text/plain',
-        'md': 'text/markdown',
-        'csv': 'text/csv',
-        'json': 'application/json',
-        'xml': 'application/xml',
-        'html': 'text/html',
-        'htm': 'text/html',
-        'css': 'text/css',
-        'js': 'application/javascript',
-        'ts': 'application/typescript',
-        
-        # Images
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'png': 'image/png',
-        'gif': 'image/gif',
-        'bmp': 'image/bmp',
-        'webp': 'image/webp',
-        'svg': 'image/svg+xml',
-        'ico': 'image/x-icon',
-        
-        # Documents
-        'pdf': 'application/pdf',
-        'doc': 'application/msword',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'xls': 'application/vnd.ms-excel',
-        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'ppt': 'application/vnd.ms-powerpoint',
-        'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-        
-        # Archives
-        'zip': 'application/zip',
-        'tar': 'application/x-tar',
-        'gz': 'application/gzip',
-        'rar': 'application/x-rar-compressed',
-        '7z': 'application/x-7z-compressed',
-        
-        # Media
-        'mp3': 'audio/mpeg',
-        'wav': 'audio/wav',
-        'mp4': 'video/mp4',
-        'avi': 'video/x-msvideo',
-        'mov': 'video/quicktime',
-        'wmv': 'video/x-ms-wmv',
-        
-        # Programming languages
-        'py': 'text/x-python',
-        'java': 'text/x-java-source',
-        'c': 'text/x-c',
-        'cpp': 'text/x-c++',
-        'h': 'text/x-c',
-        'hpp': 'text/x-c++',
-        'php': 'application/x-php',
-        'rb': 'text/x-ruby',
-        'go': 'text/x-go',
-        'rs': 'text/x-rust',
-        'sh': 'application/x-sh',
-        'bat': 'application/x-bat',
-        'ps1': 'application/x-powershell',
-        
-        # Data files
-        'yaml': 'application/x-yaml',
-        'yml': 'application/x-yaml',
-        'toml': 'application/toml',
-        'ini': 'text/plain',
-        'conf': 'text/plain',
-        'cfg': 'text/plain',
-        'log': 'text/plain'
-    }
-    
-    return content_types.get(extension, 'application/octet-stream')
@@ -58,7 +58,11 @@ function showElement(event) {
 }
 
 
-function browse(bucket, prefix, divId) {
+function browse(bucket, prefix, divId, listingUrl) {
+    if (listingUrl) {
+        browseLazily(bucket, prefix, listingUrl);
+        return;
+    }
     var template = '<ul v-bind:id="id" class="hideme">\
    <li v-for="(s3Thing,key) in s3">\
       <span v-if="s3Thing.hasOwnProperty(\'url\')">\
@@ -84,13 +88,11 @@ function browse(bucket, prefix, divId) {
         apiVersion: '2006-03-01',
         params: { Bucket: bucket }
     });
-    s3.makeUnauthenticatedRequest(
-        'listObjectsV2',
-        {Bucket: bucket, Prefix: prefix},
-        function(err, s3data) {
+    listAllObjects(s3, bucket, prefix,
+        function(err, contents) {
             if (err) console.log(err, err.stack)
             else {
-                var s3Things = s3data.Contents.map(makeS3Thing(bucket));
+                var s3Things = contents.map(makeS3Thing(bucket));
                 var s3 = makeS3Things(bucket, s3Things, 0)
                 //s3Things = s3data.Contents.map(makeS3Thing(bucket))
                 new Vue({
@@ -112,3 +114,97 @@ function browse(bucket, prefix, divId) {
     );
 }
 
+
+/*
+ * List every object under prefix, following NextContinuationToken, since
+ * listObjectsV2 returns at most 1000 keys per call.
+ */
+function listAllObjects(s3, bucket, prefix, callback) {
+    var contents = [];
+    function listPage(continuationToken) {
+        var params = {Bucket: bucket, Prefix: prefix};
+        if (continuationToken) {
+            params.ContinuationToken = continuationToken;
+        }
+        s3.makeUnauthenticatedRequest('listObjectsV2', params, function(err, s3data) {
+            if (err) return callback(err);
+            contents = contents.concat(s3data.Contents);
+            if (s3data.IsTruncated) {
+                listPage(s3data.NextContinuationToken);
+            } else {
+                callback(null, contents);
+            }
+        });
+    }
+    listPage(null);
+}
+
+
+/*
+ * Fetch one page of a folder level from the listing endpoint. The endpoint
+ * sends ETags with Cache-Control: no-cache, so the browser revalidates
+ * cached pages with If-None-Match and gets a 304 when nothing changed.
+ */
+function fetchFolderLevel(listingUrl, prefix, continuationToken) {
+    var url = listingUrl + '?prefix=' + encodeURIComponent(prefix);
+    if (continuationToken) {
+        url += '&continuation_token=' + encodeURIComponent(continuationToken);
+    }
+    return fetch(url).then(function(response) {
+        if (!response.ok) throw new Error('HTTP ' + response.status);
+        return response.json();
+    });
+}
+
+
+/*
+ * Browse tree that lists each folder only when it is first expanded,
+ * one page at a time.
+ */
+function browseLazily(bucket, prefix, listingUrl) {
+    var template = '<ul v-bind:id="id">\
+   <li v-for="file in files">\
+      <a v-bind:href="\'https://s3.amazonaws.com/\' + (listedBucket || bucket) + \'/\' + file.key" target="_new">{{file.name}}</a>\
+   </li>\
+   <li v-for="folder in folders">\
+      {{folder.name.replace(/_/g, " ")}}\
+      <button v-on:click="toggle(folder.prefix)">{{expanded[folder.prefix] ? "-" : "+"}}</button>\
+      <lazy-directory v-if="expanded[folder.prefix]" v-bind:id="id+\'-\'+folder.name" v-bind:prefix="folder.prefix"></lazy-directory>\
+   </li>\
+   <li v-if="nextToken"><button v-on:click="load">More...</button></li>\
+</ul>'
+    Vue.component('lazy-directory', {
+        props: ['prefix', 'id'],
+        template: template,
+        data: function() {
+            return { bucket: bucket, listedBucket: null, folders: [], files: [], nextToken: null, expanded: {} };
+        },
+        created: function() {
+            this.load();
+        },
+        methods: {
+            load: function() {
+                var self = this;
+                fetchFolderLevel(listingUrl, self.prefix, self.nextToken).then(function(level) {
+                    // Files are linked in the bucket the endpoint listed
+                    self.listedBucket = level.bucket;
+                    self.folders = self.folders.concat(level.folders);
+                    self.files = self.files.concat(level.files);
+                    self.nextToken = level.next_token;
+                }).catch(function(err) {
+                    console.log(err, err.stack);
+                });
+            },
+            toggle: function(folderPrefix) {
+                Vue.set(this.expanded, folderPrefix, !this.expanded[folderPrefix]);
+            }
+        }
+    });
+    new Vue({
+        el: '#app',
+        template: '<div id="app"><lazy-directory v-bind:id="\'top\'" v-bind:prefix="prefix"></lazy-directory></div>',
+        data: {
+            prefix: prefix
+        }
+    });
+}